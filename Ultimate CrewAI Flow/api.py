@@ -0,0 +1,37 @@
+import uuid
+
+from fastapi import FastAPI, HTTPException
+from kombu.exceptions import OperationalError
+from pydantic import BaseModel
+
+from tasks import run_crew_task, set_task_status, status_store
+
+# Serve with: uvicorn api:app
+app = FastAPI(title="CrewAI Flow")
+
+class TaskRequest(BaseModel):
+    question: str
+
+@app.post("/tasks")
+def create_task(request: TaskRequest):
+    """Queue a question for a worker and return immediately."""
+    question = request.question.strip()
+    if not question:
+        raise HTTPException(status_code=422, detail="Please enter a valid question.")
+
+    task_id = str(uuid.uuid4())
+    set_task_status(task_id, status="queued", question=question)
+    try:
+        result = run_crew_task.delay(task_id, question)
+    except OperationalError as e:
+        set_task_status(task_id, status="failed", error=f"Could not queue task: {e}")
+        raise HTTPException(status_code=503, detail="Task queue unavailable.")
+    return {"task_id": task_id, "celery_id": result.id}
+
+@app.get("/tasks/{task_id}")
+def get_task(task_id: str):
+    """Return the status, and the result once available, of a queued question."""
+    data = status_store.hgetall(f"task:{task_id}")
+    if not data:
+        raise HTTPException(status_code=404, detail="Task not found.")
+    return {"task_id": task_id, **data}
@@ -1,18 +1,81 @@
 import os
+import random
+import re
+import sys
 import json
+import asyncio
 import openai
 import wikipedia
 import logging
+import logging.handlers
+import sqlite3
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
 from crewai import Agent, Task, Crew
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
 
 load_dotenv()
 
-os.getenv("GOOGLE_API_KEY")
-os.getenv("GEMINI_API_KEY")
-google_cse_id = os.getenv("GOOGLE_CSE_ID")
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = 30  # seconds
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests sent without one."""
+
+    def __init__(self, *args, timeout: float = HTTP_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+# Shared HTTP session: keep-alive connections are reused instead of paying a
+# fresh TCP + TLS handshake on every lookup.
+http_session = requests.Session()
+# Connection failures and transient 5xx responses are retried with backoff here,
+# before they ever reach the callers' fallback paths. The wikipedia package
+# passes no timeout, so the adapter supplies one.
+http_retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+http_adapter = TimeoutHTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=http_retry)
+http_session.mount("https://", http_adapter)
+http_session.mount("http://", http_adapter)
+
+# The wikipedia package calls requests.get() for every API request; route it
+# through the pooled session instead. Its default API_URL is plain http, which
+# costs a redirect to https (and a second connection pool) on every lookup.
+wikipedia.wikipedia.requests = http_session
+wikipedia.wikipedia.API_URL = "https://en.wikipedia.org/w/api.php"
+
+# One HTTP/2 client for all chat completions: concurrent requests are
+# multiplexed over a single TCP + TLS connection.
+llm_http_client = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    timeout=HTTP_TIMEOUT,
+)
+
+def close_sessions():
+    """Close the shared HTTP connections."""
+    http_session.close()
+    llm_http_client.close()
 
 # Custom Exceptions
 class ConfigError(Exception):
@@ -22,96 +85,368 @@ class APIError(Exception):
     pass
 
 # Load Configuration
-def load_config(config_file: str = "config.json") -> Dict:
-    """Load configuration from a JSON file."""
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Validated settings, shared read-only by every caller."""
+    openai_api_key: str
+    google_api_key: str
+    google_cse_id: str
+    log_level: str = "INFO"
+
+@lru_cache(maxsize=None)
+def load_config(config_file: str = "config.json") -> Config:
+    """Load configuration from a JSON file, falling back to the environment (.env) for missing keys.
+
+    The file is read and validated once; later calls return the cached Config.
+    """
     try:
-        if not os.path.exists(config_file):
+        path = Path(config_file)
+        if not path.exists():
             raise ConfigError(f"Configuration file '{config_file}' not found. Please create it.")
         
-        with open(config_file, "r") as f:
-            content = f.read().strip()
-            if not content:
-                raise ConfigError(f"Configuration file '{config_file}' is empty. Please add the required keys.")
-            
-            config = json.loads(content)
+        content = path.read_text().strip()
+        if not content:
+            raise ConfigError(f"Configuration file '{config_file}' is empty. Please add the required keys.")
+        
+        config = json.loads(content)
         
         # Validate required keys
         required_keys = ["OPENAI_API_KEY", "GOOGLE_API_KEY", "GOOGLE_CSE_ID"]
-        for key in required_keys:
-            if key not in config:
-                raise ConfigError(f"Missing required key '{key}' in configuration file.")
+        values = {key: config.get(key) or os.getenv(key) for key in required_keys}
+        for key, value in values.items():
+            if not value:
+                raise ConfigError(
+                    f"Missing required key '{key}': set it in '{config_file}' or in the environment (.env)."
+                )
         
-        return config
+        return Config(
+            openai_api_key=values["OPENAI_API_KEY"],
+            google_api_key=values["GOOGLE_API_KEY"],
+            google_cse_id=values["GOOGLE_CSE_ID"],
+            log_level=config.get("LOG_LEVEL", "INFO"),
+        )
     except json.JSONDecodeError as e:
         raise ConfigError(f"Invalid JSON in configuration file: {e}")
     except Exception as e:
         raise ConfigError(f"Failed to load configuration: {e}")
 
 # Set up logging
-def setup_logging(log_level: str = "INFO"):
-    """Configure logging based on the provided log level."""
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+def setup_logging(log_level: str = "INFO", log_file: str = "crewai_flow.log"):
+    """Configure logging based on the provided log level.
+
+    Records are also written to a rotating log file, buffered in memory and
+    flushed every 1024 records, on errors, and at exit.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=5 * 1024 * 1024, backupCount=3
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler
+    )
     logging.basicConfig(
         level=log_level,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler()],
+        format=LOG_FORMAT,
+        handlers=[logging.StreamHandler(), buffered_handler],
     )
     logger = logging.getLogger(__name__)
     return logger
 
 # Initialize APIs
-def initialize_apis(config: Dict):
-    """Initialize all required APIs."""
+_active_config: Optional[Config] = None
+
+def get_config() -> Config:
+    """Return the Config passed to initialize_apis, or the default config file's."""
+    return _active_config if _active_config is not None else load_config()
+
+def initialize_apis(config: Config):
+    """Initialize all required APIs with the given configuration."""
+    global _active_config
     try:
-        openai.api_key = config["OPENAI_API_KEY"]
-        google_api_key = config["GOOGLE_API_KEY"]
-        google_cse_id = config["GOOGLE_CSE_ID"]
-        google_service = build("customsearch", "v1", developerKey=google_api_key)
+        _active_config = config
+        get_llm_client.cache_clear()
+        get_llm_client()
         logger.info("APIs initialized successfully.")
-        return google_service
     except Exception as e:
         raise APIError(f"Failed to initialize APIs: {e}")
 
 # Define helper functions
-def search_google(query: str, google_service) -> List[Dict]:
-    """Search Google using the Custom Search API."""
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+GOOGLE_CACHE_TTL = 300  # seconds
+GOOGLE_CACHE_SIZE = 512
+GOOGLE_RESULT_FIELDS = "items(title,link,snippet)"  # Partial response: skip pagemap/metadata
+WIKIPEDIA_CACHE_SIZE = 512
+
+# Bounded LRU caches keyed on normalized queries; the original query is what
+# gets sent to the APIs.
+_cache_lock = threading.Lock()
+_google_cache: "OrderedDict[Tuple[str, str], Tuple[float, List[Dict]]]" = OrderedDict()
+_wiki_cache: "OrderedDict[str, str]" = OrderedDict()
+
+def normalize_query(query: str) -> str:
+    """Normalize case and whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+def _cache_get(cache: OrderedDict, key: Hashable) -> Any:
+    """Return a cached value (or None), marking it as recently used."""
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+def _cache_put(cache: OrderedDict, key: Hashable, value: Any, max_size: int) -> int:
+    """Store a value, evicting the least recently used entries beyond max_size.
+
+    Returns the number of entries evicted.
+    """
+    evicted = 0
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+            evicted += 1
+    return evicted
+
+def search_google(query: str) -> List[Dict]:
+    """Search Google using the Custom Search JSON API."""
+    config = get_config()
+    google_cse_id = config.google_cse_id
+    key = (normalize_query(query), google_cse_id)
+    now = time.monotonic()
+    cached = _cache_get(_google_cache, key)
+    if cached:
+        if cached[0] > now:
+            return cached[1]
+        # Expired entries are evicted lazily, when they are next read
+        with _cache_lock:
+            _google_cache.pop(key, None)
     try:
         logger.info(f"Searching Google for: {query}")
-        res = google_service.cse().list(q=query, cx=google_cse_id).execute()
-        return res.get("items", [])
-    except Exception as e:
+        response = http_session.get(
+            GOOGLE_CSE_URL,
+            params={"q": query, "cx": google_cse_id, "fields": GOOGLE_RESULT_FIELDS},
+            # Keep the key out of the URL, which appears in error messages and logs
+            headers={"X-goog-api-key": config.google_api_key},
+        )
+        response.raise_for_status()
+        items = response.json().get("items", [])
+        _cache_put(_google_cache, key, (now + GOOGLE_CACHE_TTL, items), GOOGLE_CACHE_SIZE)
+        return items
+    except requests.RequestException as e:
         logger.error(f"Google search failed: {e}")
         return []
 
+# Disambiguation resolutions persist across runs so an ambiguous query costs
+# one Wikipedia round trip instead of two the next time it is asked. SQLite in
+# WAL mode is safe to share between processes (e.g. prefork Celery workers).
+DISAMBIGUATION_DB = ".wiki_disamb.sqlite3"
+_disambiguation_lock = threading.Lock()  # One connection per process, shared by its threads
+_disambiguation_db: Optional[sqlite3.Connection] = None
+
+def _disambiguation_cache() -> sqlite3.Connection:
+    """Open this process's connection to the cache on first use; callers must hold the lock."""
+    global _disambiguation_db
+    if _disambiguation_db is None:
+        db = sqlite3.connect(
+            DISAMBIGUATION_DB, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS disambiguation (query TEXT PRIMARY KEY, title TEXT NOT NULL)"
+        )
+        _disambiguation_db = db
+    return _disambiguation_db
+
+def get_resolved_title(key: str) -> Optional[str]:
+    """Return the title an ambiguous query was resolved to, if known."""
+    try:
+        with _disambiguation_lock:
+            row = _disambiguation_cache().execute(
+                "SELECT title FROM disambiguation WHERE query = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Disambiguation cache unavailable: {e}")
+        return None
+    return row[0] if row else None
+
+def save_resolved_title(key: str, title: str):
+    """Remember the title an ambiguous query was resolved to."""
+    try:
+        with _disambiguation_lock:
+            _disambiguation_cache().execute(
+                "INSERT OR REPLACE INTO disambiguation (query, title) VALUES (?, ?)", (key, title)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Disambiguation cache unavailable: {e}")
+
+def close_disambiguation_cache():
+    """Close this process's connection to the disambiguation cache if it was opened."""
+    global _disambiguation_db
+    with _disambiguation_lock:
+        if _disambiguation_db is not None:
+            _disambiguation_db.close()
+            _disambiguation_db = None
+
+WIKIPEDIA_ATTEMPTS = 3
+WIKIPEDIA_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+# Transport failures (connect/read timeouts, resets, 5xx) are already retried
+# with backoff by the session's adapter; only Wikipedia's own API-level timeout
+# is retried here, so the two layers never multiply.
+_TRANSIENT_WIKIPEDIA_ERRORS = (wikipedia.exceptions.HTTPTimeoutError,)
+
+def _wiki_summary(title: str) -> str:
+    """Fetch a two-sentence Wikipedia summary.
+
+    API-level timeouts are retried with exponential backoff and full jitter;
+    all other errors propagate immediately.
+    """
+    for attempt in range(WIKIPEDIA_ATTEMPTS):
+        try:
+            # summary() is wrapped in the package's unbounded cache; call the
+            # undecorated function so _wiki_cache is the only summary cache.
+            return wikipedia.summary.fn(title, sentences=2)
+        except _TRANSIENT_WIKIPEDIA_ERRORS as e:
+            if attempt == WIKIPEDIA_ATTEMPTS - 1:
+                raise
+            delay = random.uniform(0, WIKIPEDIA_BACKOFF * 2 ** attempt)
+            logger.warning(f"Wikipedia timed out ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
 def search_wikipedia(query: str) -> str:
     """Search Wikipedia for relevant information."""
+    key = normalize_query(query)
+    cached = _cache_get(_wiki_cache, key)
+    if cached is not None:
+        return cached
     try:
         logger.info(f"Searching Wikipedia for: {query}")
-        return wikipedia.summary(query, sentences=2)
-    except wikipedia.exceptions.DisambiguationError as e:
-        logger.warning(f"Disambiguation error for Wikipedia search: {e}")
-        return wikipedia.summary(e.options[0], sentences=2)
+        title = get_resolved_title(key) or query
+        try:
+            summary = _wiki_summary(title)
+        except wikipedia.exceptions.DisambiguationError as e:
+            logger.warning(f"Disambiguation error for Wikipedia search: {e}")
+            save_resolved_title(key, e.options[0])
+            summary = _wiki_summary(e.options[0])
+        # Only successful lookups are cached
+        if _cache_put(_wiki_cache, key, summary, WIKIPEDIA_CACHE_SIZE):
+            # summary() resolves titles through the package's cached search();
+            # drop that unbounded cache whenever ours evicts.
+            wikipedia.search.clear_cache()
+        return summary
     except wikipedia.exceptions.PageError:
         logger.warning(f"No Wikipedia page found for: {query}")
         return "No relevant Wikipedia page found."
-    except Exception as e:
+    except (wikipedia.exceptions.WikipediaException, requests.RequestException) as e:
         logger.error(f"Wikipedia search failed: {e}")
         return "Error fetching Wikipedia data."
 
-def ask_chatgpt(question: str, context: str) -> str:
-    """Ask ChatGPT to answer the question based on the context."""
+@lru_cache(maxsize=None)
+def get_llm_client() -> openai.OpenAI:
+    """Create the OpenAI client once, on top of the shared HTTP/2 connection pool."""
+    return openai.OpenAI(api_key=get_config().openai_api_key, http_client=llm_http_client)
+
+CHATGPT_MODEL = "gpt-3.5-turbo"
+SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant."}
+# Shown in place of an answer whose completion failed (returned as None).
+CHATGPT_ERROR = "Error generating response from ChatGPT."
+
+def stream_chatgpt(question: str, context: str) -> Iterator[str]:
+    """Yield ChatGPT's answer to the question piece by piece as it is generated."""
+    response = get_llm_client().chat.completions.create(
+        model=CHATGPT_MODEL,
+        messages=[
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": f"Context: {context}\nQuestion: {question}"},
+        ],
+        stream=True,
+    )
+    for chunk in response:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+def ask_chatgpt(question: str, context: str, echo: bool = False) -> Optional[str]:
+    """Ask ChatGPT to answer the question based on the context.
+
+    Returns None if the request fails. With echo enabled, the answer (or the
+    error message) is written to stdout under an "Answer:" header as it
+    streams in.
+    """
     try:
         logger.info(f"Asking ChatGPT: {question}")
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
+        if echo:
+            sys.stdout.write("\nAnswer: ")
+        parts = []
+        for delta in stream_chatgpt(question, context):
+            parts.append(delta)
+            if echo:
+                sys.stdout.write(delta)
+                sys.stdout.flush()
+        if echo:
+            sys.stdout.write("\n")
+        return "".join(parts)
+    except (openai.OpenAIError, httpx.HTTPError) as e:
+        logger.error(f"ChatGPT request failed: {e}")
+        if echo:
+            sys.stdout.write(f"{CHATGPT_ERROR}\n")
+        return None
+
+CHATGPT_BATCH_SIZE = 5  # Questions packed into a single completion
+BATCH_INSTRUCTIONS = (
+    "Answer each numbered question separately, using the context given with it. "
+    "Start each answer with a line containing only '### ANSWER n ###', where n is "
+    "the question's number, and write nothing before the first such line."
+)
+_ANSWER_MARKER_RE = re.compile(r"^[ \t]*### ANSWER (\d+) ###[ \t]*$", re.MULTILINE)
+
+def split_batch_answers(reply: str, count: int) -> Optional[List[str]]:
+    """Split a packed reply on its '### ANSWER n ###' lines.
+
+    Returns None unless the reply contains exactly the markers 1..count, in
+    order, each followed by a non-empty answer.
+    """
+    # split() yields [preamble, "1", answer 1, "2", answer 2, ...]
+    parts = _ANSWER_MARKER_RE.split(reply)
+    numbers = [int(number) for number in parts[1::2]]
+    answers = [answer.strip() for answer in parts[2::2]]
+    if numbers != list(range(1, count + 1)) or not all(answers):
+        return None
+    return answers
+
+def ask_chatgpt_batch(questions: List[str], contexts: List[str]) -> List[Optional[str]]:
+    """Ask ChatGPT several questions in one request, returning answers in order.
+
+    If the reply cannot be split into exactly one answer per question, each
+    question is asked on its own. Failed answers are None.
+    """
+    if len(questions) == 1:
+        return [ask_chatgpt(questions[0], contexts[0])]
+    try:
+        logger.info(f"Asking ChatGPT {len(questions)} questions in one request")
+        numbered = "\n\n".join(
+            f"Question {i}: {question}\nContext {i}: {context}"
+            for i, (question, context) in enumerate(zip(questions, contexts), start=1)
+        )
+        response = get_llm_client().chat.completions.create(
+            model=CHATGPT_MODEL,
             messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": f"Context: {context}\nQuestion: {question}"},
+                SYSTEM_MESSAGE,
+                {"role": "user", "content": f"{BATCH_INSTRUCTIONS}\n\n{numbered}"},
             ],
         )
-        return response.choices[0].message.content
-    except Exception as e:
+        answers = split_batch_answers(response.choices[0].message.content or "", len(questions))
+    except (openai.OpenAIError, httpx.HTTPError) as e:
         logger.error(f"ChatGPT request failed: {e}")
-        return "Error generating response from ChatGPT."
+        return [None] * len(questions)
+    if answers is None:
+        logger.warning("Could not split the batched ChatGPT reply; asking each question separately.")
+        with ThreadPoolExecutor(max_workers=len(questions)) as executor:
+            return list(executor.map(ask_chatgpt, questions, contexts))
+    return answers
 
 # Define Agents
 def create_researcher_agent():
@@ -135,24 +470,102 @@ def create_analyzer_agent():
     )
 
 # Define Tasks
-def research_task(question: str, google_service):
+def research_task(question: str):
     """Task to search Google and Wikipedia for information."""
     logger.info(f"Starting research task for: {question}")
-    google_results = search_google(question, google_service)
-    wikipedia_results = search_wikipedia(question)
+    # The two searches are independent, so run them side by side.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        google_future = executor.submit(search_google, question)
+        wikipedia_future = executor.submit(search_wikipedia, question)
+        google_results = google_future.result()
+        wikipedia_results = wikipedia_future.result()
     return {
         "google_results": google_results,
         "wikipedia_results": wikipedia_results,
     }
 
-def analyze_task(results: Dict, question: str):
-    """Task to analyze and summarize the information."""
-    logger.info(f"Starting analysis task for: {question}")
-    context = (
+def build_context(results: Dict) -> str:
+    """Format research results as context for ChatGPT."""
+    return (
         f"Google Results: {results['google_results']}\n"
         f"Wikipedia Results: {results['wikipedia_results']}"
     )
-    return ask_chatgpt(question, context)
+
+def analyze_task(results: Dict, question: str, echo: bool = False):
+    """Task to analyze and summarize the information."""
+    logger.info(f"Starting analysis task for: {question}")
+    answer = ask_chatgpt(question, build_context(results), echo=echo)
+    return answer if answer is not None else CHATGPT_ERROR
+
+def analyze_batch_task(results: List[Dict], questions: List[str]) -> List[Optional[str]]:
+    """Task to analyze several questions with a single packed ChatGPT request."""
+    logger.info(f"Starting analysis task for {len(questions)} questions")
+    return ask_chatgpt_batch(questions, [build_context(result) for result in results])
+
+# Concurrent Flow
+MAX_CONCURRENT_QUESTIONS = 8  # Keep Google/Wikipedia/OpenAI under their rate limits
+
+async def research_question(question: str, semaphore: asyncio.Semaphore) -> Dict:
+    """Run the research task for a single question."""
+    async with semaphore:
+        return await asyncio.to_thread(research_task, question)
+
+async def answer_batch(questions: List[str], semaphore: asyncio.Semaphore) -> List[Optional[str]]:
+    """Research a batch of questions concurrently, then analyze them in one ChatGPT request.
+
+    A question whose research fails gets a None answer; the rest of the batch
+    is still analyzed.
+    """
+    results = await asyncio.gather(
+        *(research_question(question, semaphore) for question in questions),
+        return_exceptions=True,
+    )
+    answers: List[Optional[str]] = [None] * len(questions)
+    researched = []
+    for i, (question, result) in enumerate(zip(questions, results)):
+        if isinstance(result, BaseException):
+            logger.error(f"Research failed for '{question}': {result}")
+        else:
+            researched.append(i)
+    if researched:
+        async with semaphore:
+            analyzed = await asyncio.to_thread(
+                analyze_batch_task,
+                [results[i] for i in researched],
+                [questions[i] for i in researched],
+            )
+        for i, answer in zip(researched, analyzed):
+            answers[i] = answer
+    return answers
+
+async def gather_answers(questions: List[str]) -> List[Optional[str]]:
+    """Process all questions concurrently so total latency tracks the slowest one.
+
+    Questions are grouped into batches of CHATGPT_BATCH_SIZE. Each batch starts
+    its analysis as soon as its own research is done, without waiting for
+    other batches.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUESTIONS)
+    batches = [
+        questions[i:i + CHATGPT_BATCH_SIZE] for i in range(0, len(questions), CHATGPT_BATCH_SIZE)
+    ]
+    answer_batches = await asyncio.gather(
+        *(answer_batch(batch, semaphore) for batch in batches),
+        return_exceptions=True,
+    )
+    answers: List[Optional[str]] = []
+    for batch, batch_answers in zip(batches, answer_batches):
+        if isinstance(batch_answers, BaseException):
+            logger.error(f"Analysis failed for a batch of {len(batch)} questions: {batch_answers}")
+            batch_answers = [None] * len(batch)
+        answers.extend(batch_answers)
+    return answers
+
+def answer_questions(questions: List[str]) -> List[Optional[str]]:
+    """Answer a batch of questions, returning the answers in input order (None if failed)."""
+    if uvloop is not None:
+        return uvloop.run(gather_answers(questions))
+    return asyncio.run(gather_answers(questions))
 
 # Define Crew
 def create_crew(researcher, analyzer):
@@ -163,7 +576,7 @@ def create_crew(researcher, analyzer):
             Task(
                 description="Search Google and Wikipedia for information related to the user's question.",
                 agent=researcher,
-                action=lambda question: research_task(question, google_service),
+                action=lambda question: research_task(question),
                 expected_output="A dictionary containing Google and Wikipedia search results.",
             ),
             Task(
@@ -176,17 +589,50 @@ def create_crew(researcher, analyzer):
         verbose=True,  # Use a boolean value (True or False)
     )
 
+# Batch Mode
+def read_batch_questions() -> List[str]:
+    """Read every piped question from stdin at once, stopping at 'exit'."""
+    questions = []
+    for line in sys.stdin.read().splitlines():
+        question = line.strip()
+        command = question.lower()
+        if command == "exit":
+            break
+        if question and command != "help":
+            questions.append(question)
+    return questions
+
+def run_batch():
+    """Answer all piped questions concurrently and print the answers in order."""
+    questions = read_batch_questions()
+    logger.info(f"Processing {len(questions)} questions from stdin.")
+    answers = answer_questions(questions)
+    # Build the report from the parallel question/answer lists and write it once.
+    report = "".join(
+        f"\nQuestion: {question}\nAnswer: {answer if answer is not None else CHATGPT_ERROR}\n"
+        for question, answer in zip(questions, answers)
+    )
+    sys.stdout.write(report)
+    sys.stdout.flush()
+    failed = sum(answer is None for answer in answers)
+    logger.info(f"Answered {len(answers) - failed} of {len(answers)} questions.")
+
 # Main Loop
 def main():
     """Main loop to handle user input and execute the CrewAI flow."""
+    if not sys.stdin.isatty():
+        run_batch()
+        return
+
     logger.info("Starting CrewAI flow. Type 'exit' to quit or 'help' for instructions.")
     while True:
         try:
             question = input("\nAsk a question (or type 'exit' to quit): ").strip()
-            if question.lower() == "exit":
+            command = question.lower()
+            if command == "exit":
                 logger.info("Exiting the program.")
                 break
-            elif question.lower() == "help":
+            elif command == "help":
                 print("\nHelp:")
                 print("1. Type your question to get an answer.")
                 print("2. Type 'exit' to quit the program.")
@@ -196,10 +642,11 @@ def main():
                 logger.warning("Please enter a valid question.")
                 continue
 
-            # Execute the CrewAI flow
+            # Run the research and analysis tasks directly so the answer
+            # streams to stdout as it is generated.
             logger.info(f"Processing question: {question}")
-            results = crew.kickoff(inputs={"question": question})
-            print(f"\nAnswer: {results}\n")
+            results = research_task(question)
+            analyze_task(results, question, echo=True)
 
         except KeyboardInterrupt:
             logger.info("\nExiting the program.")
@@ -215,14 +662,10 @@ if __name__ == "__main__":
 
         # Load configuration
         config = load_config()
+        logging.getLogger().setLevel(config.log_level)
 
         # Initialize APIs
-        google_service = initialize_apis(config)
-
-        # Create agents and crew
-        researcher = create_researcher_agent()
-        analyzer = create_analyzer_agent()
-        crew = create_crew(researcher, analyzer)
+        initialize_apis(config)
 
         # Start the main loop
         main()
@@ -231,4 +674,7 @@ if __name__ == "__main__":
     except APIError as e:
         logger.error(e)
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}")
\ No newline at end of file
+        logger.error(f"An unexpected error occurred: {e}")
+    finally:
+        close_sessions()
+        close_disambiguation_cache()
\ No newline at end of file
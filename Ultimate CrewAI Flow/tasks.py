@@ -0,0 +1,59 @@
+import os
+
+import redis
+from celery import Celery
+from celery.signals import worker_process_shutdown
+
+import main as flow
+
+# Start a worker with: celery -A tasks worker --concurrency=8
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+app = Celery("tasks", broker=f"{REDIS_URL}/0", backend=f"{REDIS_URL}/0")
+
+# Task status and results, stored as a hash under "task:{task_id}"
+status_store = redis.Redis.from_url(f"{REDIS_URL}/1", decode_responses=True)
+TASK_TTL = 24 * 60 * 60  # seconds a task's status is kept after its last update
+
+def set_task_status(task_id: str, clear: tuple = (), **fields):
+    """Update a task's status hash, drop stale fields and refresh its expiry."""
+    key = f"task:{task_id}"
+    with status_store.pipeline() as pipe:
+        pipe.hset(key, mapping=fields)
+        if clear:
+            pipe.hdel(key, *clear)
+        pipe.expire(key, TASK_TTL)
+        pipe.execute()
+
+_initialized = False
+
+def init_flow():
+    """Initialize the flow's APIs once per worker process."""
+    global _initialized
+    if not _initialized:
+        flow.initialize_apis(flow.load_config())
+        _initialized = True
+
+@worker_process_shutdown.connect
+def close_flow_resources(**kwargs):
+    """Release the flow's connections and caches when a worker process exits."""
+    flow.close_sessions()
+    flow.close_disambiguation_cache()
+
+@app.task(bind=True, max_retries=3, name="run_crew_task")
+def run_crew_task(self, task_id: str, question: str) -> str:
+    """Research and answer a question, recording its status in Redis."""
+    set_task_status(task_id, status="running")
+    try:
+        init_flow()
+        result = flow.answer_questions([question])[0]
+        if result is None:
+            raise flow.APIError(flow.CHATGPT_ERROR)
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            set_task_status(task_id, status="failed", error=str(e))
+            raise
+        set_task_status(task_id, status="retrying", error=str(e))
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
+    set_task_status(task_id, clear=("error",), status="completed", result=result)
+    return result
@@ -0,0 +1,23 @@
+from main import split_batch_answers
+
+def test_split_batch_answers_keeps_numbered_lists_inside_answers():
+    reply = "### ANSWER 1 ###\nSteps:\n1) a\n2) b\n### ANSWER 2 ###\nBerlin"
+    assert split_batch_answers(reply, 2) == ["Steps:\n1) a\n2) b", "Berlin"]
+
+def test_split_batch_answers_ignores_blank_preamble_and_whitespace():
+    reply = "\n  ### ANSWER 1 ###  \n Paris \n\n### ANSWER 2 ###\nBerlin\n"
+    assert split_batch_answers(reply, 2) == ["Paris", "Berlin"]
+
+def test_split_batch_answers_rejects_inline_markers():
+    assert split_batch_answers("1) Paris 2) Berlin", 2) is None
+    assert split_batch_answers("### ANSWER 1 ### Paris ### ANSWER 2 ### Berlin", 2) is None
+
+def test_split_batch_answers_rejects_missing_answers():
+    assert split_batch_answers("### ANSWER 1 ###\nParis", 2) is None
+    assert split_batch_answers("### ANSWER 1 ###\n\n### ANSWER 2 ###\nBerlin", 2) is None
+
+def test_split_batch_answers_rejects_out_of_order_or_extra_markers():
+    assert split_batch_answers("### ANSWER 2 ###\nBerlin\n### ANSWER 1 ###\nParis", 2) is None
+    assert split_batch_answers(
+        "### ANSWER 1 ###\nParis\n### ANSWER 2 ###\nBerlin\n### ANSWER 3 ###\nRome", 2
+    ) is None